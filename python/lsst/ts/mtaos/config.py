@@ -40,7 +40,8 @@ class Config(object):
             CSC call, or string for a filename.
         """
         if isinstance(config, str):
-            data = yaml.safe_load(open(config).read())
+            with open(config) as fp:
+                data = yaml.load(fp, Loader=utility.SafeLoader)
             self.configObj = namedtuple("configObj", data.keys())(*data.values())
         else:
             self.configObj = config
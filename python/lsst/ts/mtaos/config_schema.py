@@ -30,7 +30,9 @@ __all__ = [
 
 import yaml
 
-CONFIG_SCHEMA = yaml.safe_load(
+from .utility import SafeLoader
+
+CONFIG_SCHEMA = yaml.load(
     """
 $schema: http://json-schema.org/draft-07/schema#
 $id: https://github.com/lsst-ts/ts_MTAOS/blob/master/python/lsst/ts/MTAOS/schema_config.py
@@ -149,10 +151,11 @@ required:
   - stress_scale_factor
 
 additionalProperties: false
-"""
+""",
+    Loader=SafeLoader,
 )
 
-TELESCOPE_DOF_SCHEMA = yaml.safe_load(
+TELESCOPE_DOF_SCHEMA = yaml.load(
     """
 $schema: http://json-schema.org/draft-07/schema#
 $id: https://github.com/lsst-ts/ts_MTAOS/blob/master/python/lsst/ts/MTAOS/schema_config.py
@@ -296,10 +299,11 @@ required:
   - M2Bending
 
 additionalProperties: false
-"""
+""",
+    Loader=SafeLoader,
 )
 
-WEP_HEADER_CONFIG = yaml.safe_load(
+WEP_HEADER_CONFIG = yaml.load(
     """
 $schema: http://json-schema.org/draft-07/schema#
 $id: https://github.com/lsst-ts/ts_MTAOS/blob/master/python/lsst/ts/MTAOS/schema_config.py
@@ -325,10 +329,11 @@ properties:
     default:
       isr:
         class: lsst.ip.isr.isrTask.IsrTask
-    """
+    """,
+    Loader=SafeLoader,
 )
 
-ISR_CONFIG = yaml.safe_load(
+ISR_CONFIG = yaml.load(
     """isr:
   type: object
   additionalProperties: false
@@ -382,10 +387,11 @@ ISR_CONFIG = yaml.safe_load(
         doOverscan:
           type: boolean
           default: True
-  """
+  """,
+    Loader=SafeLoader,
 )
 
-GENERATE_DONUT_CATALOG_CONFIG = yaml.safe_load(
+GENERATE_DONUT_CATALOG_CONFIG = yaml.load(
     """generateDonutCatalogWcsTask:
   type: object
   additionalProperties: false
@@ -398,10 +404,11 @@ GENERATE_DONUT_CATALOG_CONFIG = yaml.safe_load(
       properties:
         filterName:
           type: string
-  """
+  """,
+    Loader=SafeLoader,
 )
 
-SCIENCE_SENSOR_PIPELINE_CONFIG = yaml.safe_load(
+SCIENCE_SENSOR_PIPELINE_CONFIG = yaml.load(
     """CutOutDonutsScienceSensorTask:
   type: object
   additionalProperties: false
@@ -426,10 +433,11 @@ calcZernikesTask:
     class:
       type: string
       default: lsst.ts.wep.task.calcZernikesTask.CalcZernikesTask
-"""
+""",
+    Loader=SafeLoader,
 )
 
-CWFS_PIPELINE_CONFIG = yaml.safe_load(
+CWFS_PIPELINE_CONFIG = yaml.load(
     """cutOutDonutsCwfsTask:
   type: object
   additionalProperties: false
@@ -454,5 +462,6 @@ calcZernikesTask:
     class:
       type: string
       default: lsst.ts.wep.task.calcZernikesTask.CalcZernikesTask
-"""
+""",
+    Loader=SafeLoader,
 )
@@ -49,13 +49,64 @@ from .config_schema import (
     SCIENCE_SENSOR_PIPELINE_CONFIG,
     WEP_HEADER_CONFIG,
 )
-from .utility import define_visit, get_formatted_corner_wavefront_sensors_ids, timeit
+from .utility import (
+    SafeDumper,
+    define_visit,
+    get_formatted_corner_wavefront_sensors_ids,
+    timeit,
+)
 from .wavefront_collection import WavefrontCollection
 
 
+@functools.lru_cache(maxsize=1)
+def _get_wep_configuration_validators() -> dict[str, DefaultingValidator]:
+    """Get the validators of the WEP configuration for each instrument.
+
+    The schemas are constant, so the validators are only built once and
+    shared by all `Model` instances.
+
+    Returns
+    -------
+    `dict` [`str`, `DefaultingValidator`]
+        Validator of the WEP configuration for each instrument. This is
+        shared by all callers and must not be modified.
+    """
+    science_sensor_config_schema = copy.deepcopy(WEP_HEADER_CONFIG)
+    science_sensor_config_schema["properties"]["tasks"]["properties"] = dict()
+    science_sensor_config_schema["properties"]["tasks"]["properties"].update(ISR_CONFIG)
+    science_sensor_config_schema["properties"]["tasks"]["properties"].update(
+        GENERATE_DONUT_CATALOG_CONFIG
+    )
+    science_sensor_config_schema["properties"]["tasks"]["properties"].update(
+        SCIENCE_SENSOR_PIPELINE_CONFIG
+    )
+
+    cwfs_config_schema = copy.deepcopy(WEP_HEADER_CONFIG)
+    cwfs_config_schema["properties"]["tasks"]["properties"] = dict()
+    cwfs_config_schema["properties"]["tasks"]["properties"].update(ISR_CONFIG)
+    cwfs_config_schema["properties"]["tasks"]["properties"].update(
+        GENERATE_DONUT_CATALOG_CONFIG
+    )
+    cwfs_config_schema["properties"]["tasks"]["properties"].update(CWFS_PIPELINE_CONFIG)
+
+    return dict(
+        comcam=DefaultingValidator(science_sensor_config_schema),
+        lsstCam=DefaultingValidator(cwfs_config_schema),
+        lsstFamCam=DefaultingValidator(science_sensor_config_schema),
+    )
+
+
 class Model:
     # Maximum length of queue for wavefront error
     MAX_LEN_QUEUE = 10
+    # Maximum number of bytes to read at once when logging a process stream
+    LOG_STREAM_READ_SIZE = 65536
+    # Single worker executor for the optical feedback control computations,
+    # so they run off the event loop one at a time and do not compete with
+    # the i/o work sent to the default executor.
+    OFC_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix="mtaos_ofc"
+    )
 
     def __init__(
         self,
@@ -201,33 +252,7 @@ class Model:
         self.zernike_table_name = zernike_table_name
         self.reference_detector = reference_detector
 
-        science_sensor_config_schema = copy.deepcopy(WEP_HEADER_CONFIG)
-        science_sensor_config_schema["properties"]["tasks"]["properties"] = dict()
-        science_sensor_config_schema["properties"]["tasks"]["properties"].update(
-            ISR_CONFIG
-        )
-        science_sensor_config_schema["properties"]["tasks"]["properties"].update(
-            GENERATE_DONUT_CATALOG_CONFIG
-        )
-        science_sensor_config_schema["properties"]["tasks"]["properties"].update(
-            SCIENCE_SENSOR_PIPELINE_CONFIG
-        )
-
-        cwfs_config_schema = copy.deepcopy(WEP_HEADER_CONFIG)
-        cwfs_config_schema["properties"]["tasks"]["properties"] = dict()
-        cwfs_config_schema["properties"]["tasks"]["properties"].update(ISR_CONFIG)
-        cwfs_config_schema["properties"]["tasks"]["properties"].update(
-            GENERATE_DONUT_CATALOG_CONFIG
-        )
-        cwfs_config_schema["properties"]["tasks"]["properties"].update(
-            CWFS_PIPELINE_CONFIG
-        )
-
-        self.wep_configuration_validation = dict(
-            comcam=DefaultingValidator(science_sensor_config_schema),
-            lsstCam=DefaultingValidator(cwfs_config_schema),
-            lsstFamCam=DefaultingValidator(science_sensor_config_schema),
-        )
+        self.wep_configuration_validation = dict(_get_wep_configuration_validators())
 
         # Collection of calculated list of wavefront error
         self.wavefront_errors = WavefrontCollection(self.MAX_LEN_QUEUE)
@@ -268,6 +293,20 @@ class Model:
 
         self.reset_wfe_correction()
 
+    @property
+    def collections(self) -> str:
+        """Comma-separated string with the data collections to add to the
+        pipeline task.
+        """
+        return self._collections
+
+    @collections.setter
+    def collections(self, collections: str) -> None:
+        self._collections = collections
+        # Keep the list of collections so it is not parsed on every butler
+        # access.
+        self._collections_list = collections.split(",")
+
     def get_fwhm_sensors(self):
         """Get list of fwhm sensor ids.
 
@@ -626,7 +665,7 @@ class Model:
             await self.wep_process.wait()
 
         self.wavefront_errors.append(
-            self._gather_outputs(
+            await self._gather_outputs(
                 run_name=run_name,
                 visit_id=visit_id,
                 instrument="lsstCam",
@@ -676,7 +715,7 @@ class Model:
             await self.wep_process.wait()
 
         self.wavefront_errors.append(
-            self._gather_outputs(
+            await self._gather_outputs(
                 run_name=run_name,
                 visit_id=intra_id,
                 instrument="comcam",
@@ -846,7 +885,7 @@ class Model:
                 functools.partial(
                     define_visit,
                     data_path=self.data_path,
-                    collections=self.collections.split(","),
+                    collections=self._collections_list,
                     instrument_name=self.data_instrument_name[instrument],
                     exposures_str=exposures_str,
                 ),
@@ -962,7 +1001,7 @@ class Model:
 
         config_file = tempfile.NamedTemporaryFile(suffix=".yaml")
 
-        config_file.write(yaml.safe_dump(wep_configuration).encode())
+        config_file.write(yaml.dump(wep_configuration, Dumper=SafeDumper).encode())
 
         config_file.flush()
 
@@ -1008,7 +1047,7 @@ class Model:
 
         return run_pipetask_cmd
 
-    def _gather_outputs(
+    async def _gather_outputs(
         self,
         run_name: str,
         visit_id: int,
@@ -1016,6 +1055,10 @@ class Model:
     ) -> list:
         """Gather outputs from the given run for a given visit id.
 
+        All butler operations run in the default executor, so the event loop
+        is not blocked while querying the registry or reading the zernike
+        tables. The butler is only used by one thread at a time.
+
         Parameters
         ----------
         run_name : `str`
@@ -1032,38 +1075,114 @@ class Model:
         """
         self.log.debug("Data processing completed successfully. Gathering output.")
 
-        butler = dafButler.Butler(self.data_path)
+        loop = asyncio.get_running_loop()
 
-        # We may need to run the following in an executor so we won't block the
-        # event loop.
+        butler = await loop.run_in_executor(
+            None, functools.partial(dafButler.Butler, self.data_path)
+        )
 
-        datasetRefs = list(
-            butler.registry.queryDatasets(
-                datasetType="postISRCCD", collections=[run_name]
+        # The postISRCCD datasets are only queried to be logged, skip it if
+        # they would not be logged anyway.
+        if self.log.isEnabledFor(logging.DEBUG):
+            datasetRefs = await loop.run_in_executor(
+                None,
+                functools.partial(
+                    self._query_datasets,
+                    butler=butler,
+                    dataset_type="postISRCCD",
+                    run_name=run_name,
+                ),
             )
-        )
-        for ref in datasetRefs:
-            self.log.debug(ref.dataId)
+            for ref in datasetRefs:
+                self.log.debug(ref.dataId)
 
         # Get output
-        data_ids = butler.registry.queryDatasets(
-            self.zernike_table_name,
-            collections=[run_name],
+        data_ids = await loop.run_in_executor(
+            None,
+            functools.partial(
+                self._query_datasets,
+                butler=butler,
+                dataset_type=self.zernike_table_name,
+                run_name=run_name,
+            ),
         )
 
         self.log.debug(
             f"run_name: {run_name}, visit_id: {visit_id} yielded: {data_ids}"
         )
 
+        zernike_tables = await loop.run_in_executor(
+            None,
+            functools.partial(
+                self._get_datasets,
+                butler=butler,
+                dataset_type=self.zernike_table_name,
+                data_ids=data_ids,
+                run_name=run_name,
+            ),
+        )
+
         return [
-            (
-                data_id.dataId["detector"],
-                butler.get(
-                    self.zernike_table_name,
-                    dataId=data_id.dataId,
-                    collections=[run_name],
-                ),
+            (data_id.dataId["detector"], zernike_table)
+            for data_id, zernike_table in zip(data_ids, zernike_tables)
+        ]
+
+    @staticmethod
+    def _query_datasets(
+        butler: dafButler.Butler,
+        dataset_type: str,
+        run_name: str,
+    ) -> list:
+        """Query the butler registry for datasets in a given run.
+
+        Parameters
+        ----------
+        butler : `lsst.daf.butler.Butler`
+            Butler to query.
+        dataset_type : `str`
+            Name of the dataset type.
+        run_name : `str`
+            Name of the run.
+
+        Returns
+        -------
+        `list` of `lsst.daf.butler.DatasetRef`
+            References to the datasets found.
+        """
+        return list(
+            butler.registry.queryDatasets(
+                datasetType=dataset_type,
+                collections=[run_name],
             )
+        )
+
+    @staticmethod
+    def _get_datasets(
+        butler: dafButler.Butler,
+        dataset_type: str,
+        data_ids: list,
+        run_name: str,
+    ) -> list:
+        """Read datasets from the butler.
+
+        Parameters
+        ----------
+        butler : `lsst.daf.butler.Butler`
+            Butler to read from.
+        dataset_type : `str`
+            Name of the dataset type.
+        data_ids : `list` of `lsst.daf.butler.DatasetRef`
+            References to the datasets to read.
+        run_name : `str`
+            Name of the run.
+
+        Returns
+        -------
+        `list`
+            Datasets read, in the same order as ``data_ids``.
+        """
+        return [
+            butler.get(dataset_type, dataId=data_id.dataId, collections=[run_name])
             for data_id in data_ids
         ]
 
@@ -1085,10 +1204,13 @@ class Model:
         return []
 
     @timeit
-    def calculate_corrections(self, **kwargs):
+    async def calculate_corrections(self, **kwargs):
         """Calculate the correction of subsystems based on the average
         wavefront error of multiple exposure images in a single visit.
 
+        The optical feedback control computation runs in `OFC_EXECUTOR` so it
+        does not block the event loop.
+
         Parameters
         ----------
         kwargs :
@@ -1102,15 +1224,24 @@ class Model:
 
         try:
             sensor_ids, zk_indices, wfe = self.get_wavefront_errors()
-
-            self._calculate_corrections(
-                wfe=wfe, zk_indices=zk_indices, sensor_ids=sensor_ids, **kwargs
-            )
-
         finally:
-            # Clear the queue
+            # Clear the queue before running the computation, so wavefront
+            # errors added while it runs are kept for the next one.
             self._clear_wfe_collections()
 
+        loop = asyncio.get_running_loop()
+
+        await loop.run_in_executor(
+            self.OFC_EXECUTOR,
+            functools.partial(
+                self._calculate_corrections,
+                wfe=wfe,
+                zk_indices=zk_indices,
+                sensor_ids=sensor_ids,
+                **kwargs,
+            ),
+        )
+
     def get_wavefront_errors(self):
         """Get wavefront errors.
 
@@ -1154,7 +1285,8 @@ class Model:
         ----------
         wfe : `np.ndarray`
             2D array with wavefront errors (in microns). Each element contains
-            the wavefront errors for a specific field index.
+            the wavefront errors for a specific field index. It is passed to
+            ofc as is, so it must be a contiguous array of floats.
         zk_indices : `np.ndarray [int]`
             Array with the zernike noll indices used.
         sensor_ids : `np.ndarray [int]`
@@ -1182,7 +1314,39 @@ class Model:
             rotation_angle=rotation_angle,
         )
 
-    def add_correction(self, wavefront_errors, config=None):
+    async def add_correction(self, wavefront_errors, config=None):
+        """Compute ofc corrections from user-defined wavefront erros.
+
+        The optical feedback control computation runs in `OFC_EXECUTOR` so it
+        does not block the event loop.
+
+        Parameters
+        ----------
+        wavefront_errors : `np.array` or `list` of `float`
+            Input wavefront errors (in um). If an array or list it must have
+            the same number of elements of the intrinsic zernike coeffients.
+        config : `dict`, optional
+            Optional additional configuration parameters to customize ofc.
+            Default is `None`.
+
+        Raises
+        ------
+        RuntimeError
+            No sensor ids to use.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        await loop.run_in_executor(
+            self.OFC_EXECUTOR,
+            functools.partial(
+                self._add_correction,
+                wavefront_errors=wavefront_errors,
+                config=config,
+            ),
+        )
+
+    def _add_correction(self, wavefront_errors, config=None):
         """Compute ofc corrections from user-defined wavefront erros.
 
         Parameters
@@ -1222,18 +1386,17 @@ class Model:
         # aberration. That means, if we want to "add" an aberration we have to
         # pass the negative of what we want.
 
-        final_wfe = np.copy(
-            get_intrinsic_zernikes(
-                self.ofc.ofc_data, filter_name, sensor_names, rotation_angle
-            )[:, self.ofc.ofc_data.zn_idx]
-        )
+        # Indexing with zn_idx already returns a new array, so it is safe to
+        # subtract the user input in place.
+        final_wfe = get_intrinsic_zernikes(
+            self.ofc.ofc_data, filter_name, sensor_names, rotation_angle
+        )[:, self.ofc.ofc_data.zn_idx]
 
-        for wfe in final_wfe:
-            wfe -= np.array(wavefront_errors)
+        final_wfe -= np.asarray(wavefront_errors, dtype=final_wfe.dtype)
 
         self._calculate_corrections(
             wfe=final_wfe,
-            zk_indices=np.arange(4, wfe.shape[0] + 4),
+            zk_indices=np.arange(4, final_wfe.shape[1] + 4),
             **(config if config is not None else dict()),
         )
 
@@ -1331,10 +1494,33 @@ class Model:
             Output stream pipe to process and log.
         """
 
-        while not stream.at_eof():
-            new_line = await stream.readline()
-            if len(new_line) > 0:
-                self.log.debug(new_line.decode().strip())
+        # Read the stream in chunks and log all complete lines at once. The
+        # last (possibly incomplete) line is kept until the next chunk arrives.
+        pending = b""
+
+        while True:
+            chunk = await stream.read(self.LOG_STREAM_READ_SIZE)
+            if len(chunk) == 0:
+                break
+
+            *lines, pending = (pending + chunk).split(b"\n")
+
+            for line in lines:
+                self._log_stream_line(line)
+
+        self._log_stream_line(pending)
+
+    def _log_stream_line(self, line: bytes) -> None:
+        """Log a single line from a process stream.
+
+        Parameters
+        ----------
+        line : `bytes`
+            Line to log. Empty lines are ignored.
+        """
+        message = line.decode(errors="replace").strip()
+        if len(message) > 0:
+            self.log.debug(message)
 
     def _get_visit_info(self, instrument: str, exposure: int) -> VisitInfo:
         """Get visit info from the butler.
@@ -1359,7 +1545,7 @@ class Model:
                 "exposure": exposure,
                 "detector": self.reference_detector,
             },
-            collections=self.collections.split(","),
+            collections=self._collections_list,
         )
 
     @staticmethod
@@ -1383,12 +1569,24 @@ class Model:
         wfe : `np.ndarray`
             Array of arrays with the zernike coeficients.
         """
-        sensor_ids = np.array([sensor_id for sensor_id in data_container])
+        n_sensors = len(data_container)
 
-        zk_indices = np.array(
-            [data_container[sensor_id][0] for sensor_id in data_container]
-        )
-        wfe = np.array([data_container[sensor_id][1] for sensor_id in data_container])
+        if n_sensors == 0:
+            return (
+                np.empty(0, dtype=int),
+                np.empty((0, 0), dtype=int),
+                np.empty((0, 0), dtype=float),
+            )
+
+        first_zk_indices, first_wfe = next(iter(data_container.values()))
+
+        sensor_ids = np.fromiter(data_container, dtype=int, count=n_sensors)
+        zk_indices = np.empty((n_sensors, len(first_zk_indices)), dtype=int)
+        wfe = np.empty((n_sensors, len(first_wfe)), dtype=float)
+
+        for i, (sensor_zk_indices, sensor_wfe) in enumerate(data_container.values()):
+            zk_indices[i] = sensor_zk_indices
+            wfe[i] = sensor_wfe
 
         return sensor_ids, zk_indices, wfe
 
@@ -22,14 +22,17 @@
 __all__ = ["MTAOS"]
 
 import asyncio
-import inspect
+import collections
+import copy
+import functools
 import logging
+import math
+import statistics
+import sys
 import typing
 import warnings
 
-import eups
 import numpy as np
-import yaml
 from astropy import units as u
 from lsst.ts import salobj
 from lsst.ts.idl.enums.MTAOS import FilterType
@@ -48,6 +51,113 @@ try:
 except ImportError:
     __wep_version__ = "unknown"
 
+# Parameters of the remotes for the components the MTAOS sends corrections to,
+# as (name, component, index).
+_REMOTES_PARAMETERS = (
+    ("m2hex", "MTHexapod", utility.MTHexapodIndex.M2.value),
+    ("camhex", "MTHexapod", utility.MTHexapodIndex.Camera.value),
+    ("m1m3", "MTM1M3", None),
+    ("m2", "MTM2", None),
+)
+
+# Name of the components in MTAOS.remotes that also makes the name of the
+# method to issue the correction, e.g. m2hex -> issue_m2hex_correction
+_ISSUE_CORRECTION_TO = frozenset(("m2hex", "camhex", "m1m3", "m2"))
+
+# Translation tables used to build the run name extension in runWEP from the
+# timestamp and identity of the command.
+_ISOT_STRIP = str.maketrans("", "", "-:.")
+_IDENTITY_TO_UNDERSCORE = str.maketrans("@-", "__")
+
+
+@functools.lru_cache(maxsize=1)
+def _get_subsystems_versions() -> str:
+    """Get subsystems versions string.
+
+    The versions cannot change while the process is running, so the result is
+    cached. ``eups`` is imported here because scanning the setup products is
+    expensive and only needed once.
+
+    Returns
+    -------
+    subsystems_versions : `str`
+        A comma delimited list of key=value pairs relating subsystem name
+        (key) to its version number (value).
+    """
+    import eups
+
+    lsst_distrib_version = ":".join(eups.Eups().findSetupProduct("lsst_distrib").tags)
+
+    return f"ts_ofc={__ofc_version__},ts_wep={__wep_version__},lsst_distrib={lsst_distrib_version}"
+
+
+def _total_stress(stresses: np.ndarray, stress_scale_factor: float) -> float:
+    """Compute the total stress on a mirror from its bending mode stresses.
+
+    Parameters
+    ----------
+    stresses : `np.ndarray`
+        The individual bending mode stresses on the mirror.
+    stress_scale_factor : `float`
+        Scale factor applied to the RSS of the stresses.
+
+    Returns
+    -------
+    stress : `float`
+        The total stress on the mirror.
+    """
+    return stress_scale_factor * math.sqrt(float(np.dot(stresses, stresses)))
+
+
+def _truncate_bending_modes(
+    stresses: np.ndarray,
+    bending_modes: np.ndarray,
+    stress: float,
+    stress_scale_factor: float,
+    stress_limit: float,
+) -> float:
+    """Truncate the highest order bending modes until the total stress is
+    within the limit.
+
+    Both ``stresses`` and ``bending_modes`` are modified in place.
+
+    Parameters
+    ----------
+    stresses : `np.ndarray`
+        The individual bending mode stresses on the mirror.
+    bending_modes : `np.ndarray`
+        The bending modes degrees of freedom.
+    stress : `float`
+        The current total stress on the mirror.
+    stress_scale_factor : `float`
+        Scale factor applied to the RSS of the stresses.
+    stress_limit : `float`
+        The maximum allowable stress on the mirror.
+
+    Returns
+    -------
+    stress : `float`
+        The total stress after truncating the bending modes.
+    """
+    # Each iteration zeroes the highest remaining mode, so the sum of squares
+    # after truncating mode i is the cumulative sum up to mode i - 1.
+    cumulative_sum_sq = np.cumsum(np.square(stresses))
+
+    for i in reversed(range(len(bending_modes))):
+        if stress <= stress_limit:
+            break  # RSS is within limits, stop truncating
+
+        # Set the highest remaining bending mode to zero
+        stresses[i] = 0
+        bending_modes[i] = 0
+
+        # Recalculate RSS with the truncated modes
+        stress = (
+            stress_scale_factor * math.sqrt(cumulative_sum_sq[i - 1]) if i > 0 else 0.0
+        )
+
+    return stress
+
 
 class MTAOS(salobj.ConfigurableCsc):
     # Class attribute comes from the upstream BaseCsc class
@@ -59,6 +169,9 @@ class MTAOS(salobj.ConfigurableCsc):
     LOG_FILE_NAME = "MTAOS.log"
     MAX_TIME_SAMPLE = 100
 
+    # The schema is constant, so the validator is shared by all instances.
+    state0DofValidator = salobj.DefaultingValidator(schema=TELESCOPE_DOF_SCHEMA)
+
     def __init__(
         self, config_dir=None, log_to_file=False, log_level=None, simulation_mode=0
     ):
@@ -96,7 +209,7 @@ class MTAOS(salobj.ConfigurableCsc):
         remotes : `dict`
             A dictionary with `salobj.Remote` for each component the MTAOS
             communicates with.
-        issue_correction_to : `set`
+        issue_correction_to : `frozenset`
             Set with the name of the component in self.remote that also makes
             the name of the method to issue the correction, e.g.,
             `m2hex` -> `issue_m2hex_correction`.
@@ -104,12 +217,15 @@ class MTAOS(salobj.ConfigurableCsc):
             MTAOS Model class. This attribute is initialized during
             configuration.
         issue_correction_lock : `asyncio.Lock`
-            A lock used to synchronize sending corrections to the components.
+            A lock used to synchronize sending corrections to the components
+            and any change to the model corrections. OFC computations run in
+            an executor, so every command that changes the model must hold it.
         wep_config : `dict`
             Default configuration for the wep. This is used in `do_runWEP()`,
             when the user does not provide an override configuration.
-        execution_times : `dict`
-            Dictionary to store critical execution times.
+        execution_times : `dict` [`str`, `collections.deque`]
+            Dictionary to store critical execution times. Each entry holds at
+            most `MAX_TIME_SAMPLE` samples.
         DEFAULT_TIMEOUT : `float`
             Default timeout (in seconds). Used on normal operations, e.g.
             issuing corrections to the CSCs.
@@ -145,10 +261,6 @@ class MTAOS(salobj.ConfigurableCsc):
 
         self.log.info("Prepare MTAOS CSC.")
 
-        self.state0DofValidator = salobj.DefaultingValidator(
-            schema=TELESCOPE_DOF_SCHEMA
-        )
-
         # TODO (DM-31365): Remove workaround to visitId being of type long in
         # MTAOS runWEP command.
         #
@@ -163,43 +275,47 @@ class MTAOS(salobj.ConfigurableCsc):
         # the remote from subscribing to events and telemetry from those
         # systems that we do not need, helping to solve resources.
         self.remotes = {
-            "m2hex": salobj.Remote(
-                self.domain,
-                "MTHexapod",
-                index=utility.MTHexapodIndex.M2.value,
-                include=[],
-            ),
-            "camhex": salobj.Remote(
-                self.domain,
-                "MTHexapod",
-                index=utility.MTHexapodIndex.Camera.value,
-                include=[],
-            ),
-            "m1m3": salobj.Remote(self.domain, "MTM1M3", include=[]),
-            "m2": salobj.Remote(self.domain, "MTM2", include=[]),
+            name: salobj.Remote(self.domain, component, index=index, include=[])
+            for name, component, index in _REMOTES_PARAMETERS
         }
 
-        self.execution_times = {}
+        self.execution_times = {
+            name: collections.deque(maxlen=self.MAX_TIME_SAMPLE)
+            for name in ("RUN_WEP", "CALCULATE_CORRECTIONS")
+        }
 
-        # Set with the name of the component in self.remote that also makes the
-        # name of the method to issue the correction, e.g.
-        # m2hex -> issue_m2hex_correction
-        self.issue_correction_to = {
-            "m2hex",
-            "camhex",
-            "m1m3",
-            "m2",
+        self.issue_correction_to = _ISSUE_CORRECTION_TO
+
+        # Publishers of the degrees of freedom and the component corrections,
+        # which are published together every time the corrections change.
+        self._correction_publishers = (
+            self.pubEvent_degreeOfFreedom,
+            self.pubEvent_m2HexapodCorrection,
+            self.pubEvent_cameraHexapodCorrection,
+            self.pubEvent_m1m3Correction,
+            self.pubEvent_m2Correction,
+        )
+
+        # Map the name of the components to the bound method that issues
+        # their correction, so a misnamed component fails at construction.
+        self._issue_correction_callables = {
+            comp: getattr(self, f"issue_{comp}_correction")
+            for comp in self.issue_correction_to
         }
 
         # Model class to do the real data processing
         self.model = None
 
-        # Lock to prevent multiple issueCorrection commands to execute at the
-        # same time.
+        # Lock to prevent multiple commands that change the model corrections
+        # to execute at the same time.
         self.issue_correction_lock = asyncio.Lock()
 
         self.wep_config = dict()
 
+        # Instrument and WEP configuration of the last successful validation,
+        # to avoid validating the same configuration again when reconfiguring.
+        self._validated_wep_config = None
+
         self.log.info("MTAOS CSC is ready.")
 
     async def configure(self, config: typing.Any) -> None:
@@ -234,8 +350,9 @@ class MTAOS(salobj.ConfigurableCsc):
         dof_state0 = None
 
         if state0_dof_file is not None:
-            with open(state0_dof_file) as fp:
-                dof_state0 = self.state0DofValidator.validate(yaml.safe_load(fp))
+            dof_state0 = self.state0DofValidator.validate(
+                utility.load_yaml_file(state0_dof_file)
+            )
 
         ofc_config_dir = self.config_dir / "ofc"
         if ofc_config_dir.exists():
@@ -259,26 +376,19 @@ class MTAOS(salobj.ConfigurableCsc):
             log=self.log,
             run_name=config.run_name,
             collections=config.collections,
-            pipeline_instrument=(
-                config.pipeline_instrument
-                if hasattr(config, "pipeline_instrument")
-                else None
-            ),
+            pipeline_instrument=getattr(config, "pipeline_instrument", None),
             pipeline_n_processes=config.pipeline_n_processes,
             zernike_table_name=config.zernike_table_name,
-            data_instrument_name=(
-                config.data_instrument_name
-                if hasattr(config, "data_instrument_name")
-                else None
-            ),
+            data_instrument_name=getattr(config, "data_instrument_name", None),
         )
 
         if dof_state0 is not None:
             self.model.ofc_data.dof_state0 = dof_state0
 
-        if hasattr(config, "wep_config"):
-            with open(self.config_dir / config.wep_config) as fp:
-                self.wep_config = yaml.safe_load(fp)
+        wep_config_path = getattr(config, "wep_config", None)
+        if wep_config_path is not None:
+            self.wep_config = utility.load_yaml_file(self.config_dir / wep_config_path)
+            if self._validated_wep_config != (config.instrument, self.wep_config):
                 try:
                     self.model.wep_configuration_validation[config.instrument].validate(
                         self.wep_config
@@ -289,6 +399,10 @@ class MTAOS(salobj.ConfigurableCsc):
                         f"Failed to validate WEP configuration with {e}. "
                         "Check CSC logs for more information."
                     )
+                self._validated_wep_config = (
+                    config.instrument,
+                    copy.deepcopy(self.wep_config),
+                )
         else:
             self.wep_config = dict()
 
@@ -314,8 +428,13 @@ class MTAOS(salobj.ConfigurableCsc):
     def _logExecFunc(self):
         """Log the executed function."""
 
-        funcName = inspect.stack()[1].function
-        self.log.info(f"Execute {funcName}().")
+        if not self.log.isEnabledFor(logging.INFO):
+            return
+
+        # sys._getframe only looks up the caller frame, where inspect.stack
+        # builds the entire stack including the source code context.
+        funcName = sys._getframe(1).f_code.co_name
+        self.log.info("Execute %s().", funcName)
 
     @staticmethod
     def get_config_pkg():
@@ -355,15 +474,21 @@ class MTAOS(salobj.ConfigurableCsc):
         self._logExecFunc()
         self.assert_enabled()
 
-        # If resetting wavefront error fails (e.g. raise an exception) command
-        # will be rejected. Events will not be published.
-        self.model.reset_wfe_correction()
+        # This command may have to wait for other commands holding the lock,
+        # so will send ack_in_progress with estimated timeout.
+        await self.cmd_resetCorrection.ack_in_progress(
+            data,
+            timeout=self.DEFAULT_TIMEOUT,
+            result="resetCorrection started.",
+        )
 
-        await self.pubEvent_degreeOfFreedom()
-        await self.pubEvent_m2HexapodCorrection()
-        await self.pubEvent_cameraHexapodCorrection()
-        await self.pubEvent_m1m3Correction()
-        await self.pubEvent_m2Correction()
+        # The model must not change while other commands are using it.
+        async with self.issue_correction_lock:
+            # If resetting wavefront error fails (e.g. raise an exception)
+            # command will be rejected. Events will not be published.
+            self.model.reset_wfe_correction()
+
+            await self._publish_corrections()
 
     async def do_issueCorrection(self, data):
         """Command to issue the wavefront corrections to the M2 hexapod, camera
@@ -409,14 +534,20 @@ class MTAOS(salobj.ConfigurableCsc):
         self._logExecFunc()
         self.assert_enabled()
 
-        await self.pubEvent_rejectedDegreeOfFreedom()
-        self.model.reject_correction()
+        # This command may have to wait for other commands holding the lock,
+        # so will send ack_in_progress with estimated timeout.
+        await self.cmd_rejectCorrection.ack_in_progress(
+            data,
+            timeout=self.DEFAULT_TIMEOUT,
+            result="rejectCorrection started.",
+        )
 
-        await self.pubEvent_degreeOfFreedom()
-        await self.pubEvent_m2HexapodCorrection()
-        await self.pubEvent_cameraHexapodCorrection()
-        await self.pubEvent_m1m3Correction()
-        await self.pubEvent_m2Correction()
+        # The model must not change while other commands are using it.
+        async with self.issue_correction_lock:
+            await self.pubEvent_rejectedDegreeOfFreedom()
+            self.model.reject_correction()
+
+            await self._publish_corrections()
 
     async def do_selectSources(self, data):
         """Run source selection algorithm for a specific field and visit
@@ -471,7 +602,7 @@ class MTAOS(salobj.ConfigurableCsc):
             # in MTAOS runWEP command.
             await self.model.pre_process(
                 visit_id=self.visit_id_offset + data.visitId,
-                config=yaml.safe_load(data.config),
+                config=utility.load_yaml(data.config),
             )
 
     async def do_runWEP(self, data):
@@ -497,13 +628,10 @@ class MTAOS(salobj.ConfigurableCsc):
         else:
             # timestamp command was sent in ISO 8601 compliant date-time format
             # (YYYY-MM-DDTHH:MM:SS.sss), removing invalid characters.
-            timestamp_sent_isot = (
-                astropy_time_from_tai_unix(data.private_sndStamp)
-                .isot.replace("-", "")
-                .replace(":", "")
-                .replace(".", "")
-            )
-            private_identity = data.private_identity.replace("@", "_").replace("-", "_")
+            timestamp_sent_isot = astropy_time_from_tai_unix(
+                data.private_sndStamp
+            ).isot.translate(_ISOT_STRIP)
+            private_identity = data.private_identity.translate(_IDENTITY_TO_UNDERSCORE)
 
             run_name_extention = f"_{private_identity}_{timestamp_sent_isot}"
 
@@ -515,7 +643,7 @@ class MTAOS(salobj.ConfigurableCsc):
                     self.visit_id_offset + data.extraId if data.extraId > 0 else None
                 ),
                 config=(
-                    yaml.safe_load(data.config)
+                    utility.load_yaml(data.config)
                     if len(data.config) > 0
                     else self.wep_config
                 ),
@@ -527,9 +655,6 @@ class MTAOS(salobj.ConfigurableCsc):
             await self.pubEvent_rejectedWavefrontError()
             await self.pubEvent_wepDuration()
 
-            while len(self.execution_times["RUN_WEP"]) > self.MAX_TIME_SAMPLE:
-                self.execution_times["RUN_WEP"].pop(0)
-
     async def do_runOFC(self, data):
         """Run OFC on the latest wavefront errors data. Before running this
         command, you must have ran runWEP at least once.
@@ -561,35 +686,28 @@ class MTAOS(salobj.ConfigurableCsc):
                     DeprecationWarning,
                 )
 
-            config = yaml.safe_load(data.config) if len(data.config) > 0 else dict()
+            config = utility.load_yaml(data.config) if len(data.config) > 0 else dict()
 
             # Set the ofc_data values based on configuration
             # This is needed to set what degrees of freedom will be used,
-            # how many zernikes, etc.
-            self.log.debug("Customizing OFC parameters.")
-            await self.model.set_ofc_data_values(**config)
+            # how many zernikes, etc. There is nothing to set when no
+            # configuration is provided.
+            if config:
+                self.log.debug("Customizing OFC parameters.")
+                await self.model.set_ofc_data_values(**config)
 
             # If this call fails (raise an exeception), command will be
             # rejected.
-            # This is not a coroutine so it will block the event loop. Need
-            # to think about how to fix it, maybe run in executor?
-            self.model.calculate_corrections(log_time=self.execution_times, **config)
-
-            while (
-                len(self.execution_times["CALCULATE_CORRECTIONS"])
-                > self.MAX_TIME_SAMPLE
-            ):
-                self.execution_times["CALCULATE_CORRECTIONS"].pop(0)
+            await self.model.calculate_corrections(
+                log_time=self.execution_times, **config
+            )
 
             self.log.debug("Calculate the subsystem correction successfully.")
 
-            await self.pubEvent_degreeOfFreedom()
-            await self.pubEvent_mirrorStresses()
-            await self.pubEvent_m2HexapodCorrection()
-            await self.pubEvent_cameraHexapodCorrection()
-            await self.pubEvent_m1m3Correction()
-            await self.pubEvent_m2Correction()
-            await self.pubEvent_ofcDuration()
+            await self._publish_corrections(
+                self.pubEvent_mirrorStresses,
+                self.pubEvent_ofcDuration,
+            )
 
     async def do_addAberration(self, data):
         """Utility command to add aberration to the system based on user
@@ -615,9 +733,9 @@ class MTAOS(salobj.ConfigurableCsc):
         # This lock will block any subsequent command from being executed until
         # this one is done.
         async with self.issue_correction_lock:
-            config = yaml.safe_load(data.config)
+            config = utility.load_yaml(data.config)
 
-            if config is not None:
+            if config:
                 self.log.debug("Customizing OFC parameters.")
                 original_ofc_data_values = await self.model.set_ofc_data_values(
                     **config
@@ -626,17 +744,13 @@ class MTAOS(salobj.ConfigurableCsc):
                 original_ofc_data_values = dict()
 
             try:
-                self.model.add_correction(wavefront_errors=data.wf, config=config)
+                await self.model.add_correction(wavefront_errors=data.wf, config=config)
             finally:
-                if len(original_ofc_data_values) > 0:
+                if original_ofc_data_values:
                     self.log.debug("Restoring ofc_data values.")
                     await self.model.set_ofc_data_values(**original_ofc_data_values)
 
-            await self.pubEvent_degreeOfFreedom()
-            await self.pubEvent_m2HexapodCorrection()
-            await self.pubEvent_cameraHexapodCorrection()
-            await self.pubEvent_m1m3Correction()
-            await self.pubEvent_m2Correction()
+            await self._publish_corrections()
 
     async def do_interruptWEP(self, data: salobj.type_hints.BaseDdsDataType) -> None:
         """Interrupt a running wep process.
@@ -671,17 +785,12 @@ class MTAOS(salobj.ConfigurableCsc):
         )
 
         async with self.issue_correction_lock:
-            self.model.offset_dof(offset=np.array(data.value))
+            self.model.offset_dof(offset=np.asarray(data.value, dtype=float))
 
             # if the corrections fails it will republish the dof event
             # after undoing the offsets.
             await self.handle_corrections()
-            await self.pubEvent_degreeOfFreedom()
-            await self.pubEvent_mirrorStresses()
-            await self.pubEvent_m2HexapodCorrection()
-            await self.pubEvent_cameraHexapodCorrection()
-            await self.pubEvent_m1m3Correction()
-            await self.pubEvent_m2Correction()
+            await self._publish_corrections(self.pubEvent_mirrorStresses)
 
     async def do_resetOffsetDOF(self, data: salobj.type_hints.BaseDdsDataType) -> None:
         """Implement command reset offset dof.
@@ -710,8 +819,10 @@ class MTAOS(salobj.ConfigurableCsc):
             # if the corrections fails it will republish the dof event
             # after undoing the offsets.
             await self.handle_corrections()
-            await self.pubEvent_degreeOfFreedom()
-            await self.pubEvent_mirrorStresses()
+            await asyncio.gather(
+                self.pubEvent_degreeOfFreedom(),
+                self.pubEvent_mirrorStresses(),
+            )
 
     def apply_stress_correction(
         self,
@@ -746,7 +857,7 @@ class MTAOS(salobj.ConfigurableCsc):
 
         # Get the bending modes within the specified range
         bending_modes = dof_aggr[start_idx:end_idx].copy()
-        stress = self.stress_scale_factor * np.sqrt(np.sum(np.square(stresses)))
+        stress = _total_stress(stresses, self.stress_scale_factor)
 
         # Check if the stress is over the limit
         if stress > stress_limit:
@@ -768,18 +879,13 @@ class MTAOS(salobj.ConfigurableCsc):
                     " to only apply lower-order bending modes."
                 )
 
-                for i in reversed(range(len(bending_modes))):
-                    if stress <= stress_limit:
-                        break  # RSS is within limits, stop truncating
-
-                    # Set the highest remaining bending mode to zero
-                    stresses[i] = 0
-                    bending_modes[i] = 0
-
-                    # Recalculate RSS with the truncated modes
-                    stress = self.stress_scale_factor * np.sqrt(
-                        np.sum(np.square(stresses))
-                    )
+                stress = _truncate_bending_modes(
+                    stresses,
+                    bending_modes,
+                    stress,
+                    self.stress_scale_factor,
+                    stress_limit,
+                )
 
                 self.log.warning(
                     f"After truncating, the new total stress is {stress:.2f} psi, "
@@ -787,7 +893,7 @@ class MTAOS(salobj.ConfigurableCsc):
                 )
 
             # Update the dof_aggr with the modified bending modes
-            dof_aggr[start_idx:end_idx] = bending_modes.copy()
+            dof_aggr[start_idx:end_idx] = bending_modes
 
         else:
             self.log.info(
@@ -832,24 +938,20 @@ class MTAOS(salobj.ConfigurableCsc):
 
         # Issue all corrections concurrently. If any of them fails, undo
         # corrections and reject command.
-        issue_corrections_tasks = dict(
-            [
-                (comp, asyncio.create_task(getattr(self, f"issue_{comp}_correction")()))
-                for comp in self.issue_correction_to
-            ]
-        )
+        issue_corrections_tasks = {
+            comp: asyncio.create_task(issue_correction())
+            for comp, issue_correction in self._issue_correction_callables.items()
+        }
 
         # Wait for all corrections to complete
-        await asyncio.gather(
-            *[task for task in issue_corrections_tasks.values()],
+        results = await asyncio.gather(
+            *issue_corrections_tasks.values(),
             return_exceptions=True,
         )
 
         # Check if there was any exception. If so, undo all successfull
         # corrections and reject command.
-        if any(
-            [task.exception() is not None for task in issue_corrections_tasks.values()]
-        ):
+        if any(isinstance(result, BaseException) for result in results):
             await self.pubEvent_rejectedDegreeOfFreedom()
             self.model.reject_correction()
             await self.pubEvent_degreeOfFreedom()
@@ -891,7 +993,7 @@ class MTAOS(salobj.ConfigurableCsc):
                 # fails to undo the exception log the error and continue.
                 self.log.warning(f"Undoing {comp} correction.")
                 try:
-                    await getattr(self, f"issue_{comp}_correction")()
+                    await self._issue_correction_callables[comp]()
                 except Exception:
                     self.log.exception(
                         f"Failed to undo successful correction in {comp}."
@@ -1012,6 +1114,99 @@ class MTAOS(salobj.ConfigurableCsc):
             await self.pubEvent_rejectedM2Correction()
             raise
 
+    @staticmethod
+    def _build_wavefront_error_payload(
+        zk_indices: np.ndarray, wfe: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Build the arrays of the wavefront error events for all sensors.
+
+        Parameters
+        ----------
+        zk_indices : `np.ndarray` [`int`]
+            Zernike noll indices of each sensor, with shape
+            (n_sensors, n_zernikes).
+        wfe : `np.ndarray` [`float`]
+            Zernike coefficients of each sensor, with shape
+            (n_sensors, n_zernikes).
+
+        Returns
+        -------
+        zk_indices_extended : `np.ndarray` [`int`]
+            Zernike noll indices padded with zeros to 100 elements per sensor.
+        wfe_extended : `np.ndarray` [`float`]
+            Zernike coefficients padded with nan to 100 elements per sensor.
+        annular_zernike_coeffs : `np.ndarray` [`float`]
+            Annular zernike coefficients, z4 to z22, of each sensor.
+        """
+        n_sensors = len(zk_indices)
+
+        zk_indices_extended = np.zeros((n_sensors, 100), dtype=int)
+        wfe_extended = np.full((n_sensors, 100), np.nan)
+        zk_indices_extended[:, : zk_indices.shape[1]] = zk_indices
+        wfe_extended[:, : wfe.shape[1]] = wfe
+
+        annular_zernike_coeffs = np.zeros((n_sensors, 19))
+        positions = zk_indices - 4
+        rows, columns = np.nonzero(
+            (positions >= 0) & (positions < annular_zernike_coeffs.shape[1])
+        )
+        annular_zernike_coeffs[rows, positions[rows, columns]] = wfe[rows, columns]
+
+        return zk_indices_extended, wfe_extended, annular_zernike_coeffs
+
+    async def _publish_wavefront_error(
+        self,
+        event: salobj.topics.ControllerEvent,
+        sensor_ids: np.ndarray,
+        zk_indices: np.ndarray,
+        wfe: np.ndarray,
+    ) -> None:
+        """Publish one wavefront error event per sensor.
+
+        Parameters
+        ----------
+        event : `salobj.topics.ControllerEvent`
+            Event to publish the wavefront errors to.
+        sensor_ids : `np.ndarray` [`int`]
+            Array with sensor ids.
+        zk_indices : `np.ndarray` [`int`]
+            Zernike noll indices of each sensor.
+        wfe : `np.ndarray` [`float`]
+            Zernike coefficients of each sensor.
+        """
+        (
+            zk_indices_extended,
+            wfe_extended,
+            annular_zernike_coeffs,
+        ) = self._build_wavefront_error_payload(zk_indices, wfe)
+
+        for i, sensor_id in enumerate(sensor_ids):
+            await event.set_write(
+                sensorId=sensor_id,
+                nollZernikeIndices=zk_indices_extended[i],
+                nollZernikeValues=wfe_extended[i],
+                annularZernikeCoeff=annular_zernike_coeffs[i],
+                force_output=True,
+            )
+
+    async def _publish_corrections(
+        self, *additional_publishers: typing.Callable[[], typing.Awaitable[None]]
+    ) -> None:
+        """Publish the degrees of freedom and the component corrections
+        concurrently.
+
+        Parameters
+        ----------
+        *additional_publishers : `typing.Callable`
+            Additional event publishers to run together with the corrections.
+        """
+        await asyncio.gather(
+            *[
+                publish()
+                for publish in self._correction_publishers + additional_publishers
+            ]
+        )
+
     async def pubEvent_wavefrontError(self):
         """Publish the calculated wavefront error calculated by WEP.
 
@@ -1021,28 +1216,9 @@ class MTAOS(salobj.ConfigurableCsc):
         self._logExecFunc()
         self.model.get_wfe()
 
-        for sensor_id, zernike_indices, zernike_values in zip(
-            *self.model.get_wavefront_errors()
-        ):
-            annular_zernike_coeffs = np.zeros(19)
-            for zernike_index, zernike_value in zip(zernike_indices, zernike_values):
-                position = zernike_index - 4
-                if 0 <= position < 19:
-                    annular_zernike_coeffs[position] = zernike_value
-
-            zernike_indices_extended = np.zeros(100, dtype=int)
-            zernike_values_extended = np.full(100, np.nan)
-            zernike_indices_extended[: zernike_indices.size] = zernike_indices
-            zernike_values_extended[: zernike_values.size] = zernike_values
-
-            await self.evt_wavefrontError.set_write(
-                sensorId=sensor_id,
-                nollZernikeIndices=zernike_indices_extended,
-                nollZernikeValues=zernike_values_extended,
-                annularZernikeCoeff=annular_zernike_coeffs,
-                force_output=True,
-            )
-            await asyncio.sleep(0.1)
+        await self._publish_wavefront_error(
+            self.evt_wavefrontError, *self.model.get_wavefront_errors()
+        )
 
     async def pubEvent_rejectedWavefrontError(self):
         """Publish the rejected calculated wavefront error calculated by WEP.
@@ -1053,28 +1229,9 @@ class MTAOS(salobj.ConfigurableCsc):
         self._logExecFunc()
         self.model.get_rejected_wfe()
 
-        for sensor_id, zernike_indices, zernike_values in zip(
-            *self.model.get_rejected_wavefront_errors()
-        ):
-            annular_zernike_coeffs = np.zeros(19)
-            for zernike_index, zernike_value in zip(zernike_indices, zernike_values):
-                position = zernike_index - 4
-                if 0 <= position < 19:
-                    annular_zernike_coeffs[position] = zernike_value
-
-            zernike_indices_extended = np.zeros(100, dtype=int)
-            zernike_values_extended = np.full(100, np.nan)
-            zernike_indices_extended[: zernike_indices.size] = zernike_indices
-            zernike_values_extended[: zernike_values.size] = zernike_values
-
-            await self.evt_rejectedWavefrontError.set_write(
-                sensorId=sensor_id,
-                nollZernikeIndices=zernike_indices_extended,
-                nollZernikeValues=zernike_values_extended,
-                annularZernikeCoeff=annular_zernike_coeffs,
-                force_output=True,
-            )
-            await asyncio.sleep(0.1)
+        await self._publish_wavefront_error(
+            self.evt_rejectedWavefrontError, *self.model.get_rejected_wavefront_errors()
+        )
 
     async def pubEvent_degreeOfFreedom(self):
         """Publish the degree of freedom generated by the OFC calculation.
@@ -1105,12 +1262,8 @@ class MTAOS(salobj.ConfigurableCsc):
         m2_stresses = self.model.get_m2_bending_mode_stresses()
 
         # Calculate the total stress on the mirror
-        m1m3_total_stress = self.stress_scale_factor * np.sqrt(
-            np.sum(np.square(m1m3_stresses))
-        )
-        m2_total_stress = self.stress_scale_factor * np.sqrt(
-            np.sum(np.square(m2_stresses))
-        )
+        m1m3_total_stress = _total_stress(m1m3_stresses, self.stress_scale_factor)
+        m2_total_stress = _total_stress(m2_stresses, self.stress_scale_factor)
 
         await self.evt_mirrorStresses.set_write(
             stressM2=m2_total_stress,
@@ -1141,9 +1294,8 @@ class MTAOS(salobj.ConfigurableCsc):
 
         self._logExecFunc()
 
-        x, y, z, u, v, w = self.model.m2_hexapod_correction()
-        await self.evt_m2HexapodCorrection.set_write(
-            x=x, y=y, z=z, u=u, v=v, w=w, force_output=True
+        await self._publish_hexapod_correction(
+            self.evt_m2HexapodCorrection, self.model.m2_hexapod_correction()
         )
 
     async def pubEvent_rejectedM2HexapodCorrection(self):
@@ -1153,9 +1305,8 @@ class MTAOS(salobj.ConfigurableCsc):
 
         self._logExecFunc()
 
-        x, y, z, u, v, w = self.model.m2_hexapod_correction()
-        await self.evt_rejectedM2HexapodCorrection.set_write(
-            x=x, y=y, z=z, u=u, v=v, w=w, force_output=True
+        await self._publish_hexapod_correction(
+            self.evt_rejectedM2HexapodCorrection, self.model.m2_hexapod_correction()
         )
 
     async def pubEvent_cameraHexapodCorrection(self):
@@ -1165,9 +1316,8 @@ class MTAOS(salobj.ConfigurableCsc):
 
         self._logExecFunc()
 
-        x, y, z, u, v, w = self.model.cam_hexapod_correction()
-        await self.evt_cameraHexapodCorrection.set_write(
-            x=x, y=y, z=z, u=u, v=v, w=w, force_output=True
+        await self._publish_hexapod_correction(
+            self.evt_cameraHexapodCorrection, self.model.cam_hexapod_correction()
         )
 
     async def pubEvent_rejectedCameraHexapodCorrection(self):
@@ -1177,11 +1327,26 @@ class MTAOS(salobj.ConfigurableCsc):
 
         self._logExecFunc()
 
-        x, y, z, u, v, w = self.model.cam_hexapod_correction()
-        await self.evt_rejectedCameraHexapodCorrection.set_write(
-            x=x, y=y, z=z, u=u, v=v, w=w, force_output=True
+        await self._publish_hexapod_correction(
+            self.evt_rejectedCameraHexapodCorrection,
+            self.model.cam_hexapod_correction(),
         )
 
+    async def _publish_hexapod_correction(
+        self, event: salobj.topics.ControllerEvent, correction: typing.Sequence[float]
+    ) -> None:
+        """Publish a hexapod correction.
+
+        Parameters
+        ----------
+        event : `salobj.topics.ControllerEvent`
+            Event to publish the correction to.
+        correction : `list` [`float`]
+            Hexapod correction, in the order x, y, z, u, v, w.
+        """
+        x, y, z, u, v, w = correction
+        await event.set_write(x=x, y=y, z=z, u=u, v=v, w=w, force_output=True)
+
     async def pubEvent_m1m3Correction(self):
         """Publish the M1M3 correction that would be commanded if the
         issueWavefrontCorrection command was sent.
@@ -1231,12 +1396,8 @@ class MTAOS(salobj.ConfigurableCsc):
 
         self._logExecFunc()
 
-        duration = (
-            np.mean(self.execution_times["RUN_WEP"])
-            if "RUN_WEP" in self.execution_times
-            and len(self.execution_times["RUN_WEP"]) > 0
-            else 0.0
-        )
+        execution_times = self.execution_times.get("RUN_WEP")
+        duration = statistics.fmean(execution_times) if execution_times else 0.0
         await self.evt_wepDuration.set_write(calcTime=duration)
 
     async def pubEvent_ofcDuration(self):
@@ -1244,12 +1405,8 @@ class MTAOS(salobj.ConfigurableCsc):
 
         self._logExecFunc()
 
-        duration = (
-            np.mean(self.execution_times["CALCULATE_CORRECTIONS"])
-            if "CALCULATE_CORRECTIONS" in self.execution_times
-            and len(self.execution_times["CALCULATE_CORRECTIONS"]) > 0
-            else 0.0
-        )
+        execution_times = self.execution_times.get("CALCULATE_CORRECTIONS")
+        duration = statistics.fmean(execution_times) if execution_times else 0.0
         await self.evt_ofcDuration.set_write(calcTime=duration)
 
     def get_subsystems_versions(self) -> str:
@@ -1262,11 +1419,7 @@ class MTAOS(salobj.ConfigurableCsc):
             (key) to its version number (value).
         """
 
-        lsst_distrib_version = ":".join(
-            eups.Eups().findSetupProduct("lsst_distrib").tags
-        )
-
-        return f"ts_ofc={__ofc_version__},ts_wep={__wep_version__},lsst_distrib={lsst_distrib_version}"
+        return _get_subsystems_versions()
 
     @classmethod
     def add_arguments(cls, parser):
@@ -33,9 +33,13 @@ __all__ = [
     "timeit",
     "get_formatted_corner_wavefront_sensors_ids",
     "define_visit",
+    "load_yaml",
+    "load_yaml_file",
 ]
 
 import asyncio
+import copy
+import functools
 import logging
 import os
 import re
@@ -45,11 +49,19 @@ from enum import Enum, auto
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
+import yaml
 from lsst.daf.butler import Butler
 from lsst.obs.base import DefineVisitsTask, Instrument
 from lsst.obs.lsst.translators.lsstCam import LsstCamTranslator
 from lsst.utils import getPackageDir
 
+# SafeDumper is not used here, but model.py imports it from this module.
+try:
+    from yaml import CSafeDumper as SafeDumper  # noqa: F401
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeDumper, SafeLoader  # noqa: F401
+
 
 class WEPWarning(Enum):
     NoWarning = 0
@@ -347,5 +359,103 @@ def define_visit(
     task.run(exposure_data_ids)
 
 
+# Parsed values of the trivial yaml documents commands are usually sent with.
+_TRIVIAL_YAML = {"": None, "~": None, "null": None, "{}": dict()}
+
+
+def load_yaml(yaml_str: str) -> typing.Any:
+    """Parse a yaml string.
+
+    The libyaml C loader is used when available, and the parsed values are
+    cached, so a configuration that is sent repeatedly is only parsed once.
+
+    Parameters
+    ----------
+    yaml_str : `str`
+        String with the yaml document.
+
+    Returns
+    -------
+    `typing.Any`
+        Parsed yaml document. A new copy is returned on every call, so it is
+        safe to modify it.
+    """
+    stripped_yaml_str = yaml_str.strip()
+    if stripped_yaml_str in _TRIVIAL_YAML:
+        return copy.copy(_TRIVIAL_YAML[stripped_yaml_str])
+
+    return copy.deepcopy(_load_yaml_cached(yaml_str))
+
+
+@functools.lru_cache(maxsize=64)
+def _load_yaml_cached(yaml_str: str) -> typing.Any:
+    """Parse a yaml string and cache the result.
+
+    Parameters
+    ----------
+    yaml_str : `str`
+        String with the yaml document.
+
+    Returns
+    -------
+    `typing.Any`
+        Parsed yaml document. This is shared by all callers and must not be
+        modified, use `load_yaml` instead.
+    """
+    return yaml.load(yaml_str, Loader=SafeLoader)
+
+
+def load_yaml_file(path: str | os.PathLike) -> typing.Any:
+    """Parse a yaml file.
+
+    The parsed values are cached by path, inode, modification time and size,
+    so a file is only parsed again if it changes.
+
+    Parameters
+    ----------
+    path : `str` or `os.PathLike`
+        Path to the yaml file.
+
+    Returns
+    -------
+    `typing.Any`
+        Parsed yaml document. A new copy is returned on every call, so it is
+        safe to modify it.
+    """
+    path = os.fspath(path)
+    stat = os.stat(path)
+    return copy.deepcopy(
+        _load_yaml_file_cached(path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _load_yaml_file_cached(
+    path: str, inode: int, mtime_ns: int, size: int
+) -> typing.Any:
+    """Parse a yaml file and cache the result.
+
+    Parameters
+    ----------
+    path : `str`
+        Path to the yaml file.
+    inode : `int`
+        Inode number of the file. Only used as part of the cache key.
+    mtime_ns : `int`
+        Modification time of the file, in nanoseconds. Only used as part of
+        the cache key.
+    size : `int`
+        Size of the file, in bytes. Only used as part of the cache key.
+
+    Returns
+    -------
+    `typing.Any`
+        Parsed yaml document. This is shared by all callers and must not be
+        modified, use `load_yaml_file` instead.
+    """
+    with open(path) as fp:
+        return yaml.load(fp, Loader=SafeLoader)
+
+
 if __name__ == "__main__":
     pass
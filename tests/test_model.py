@@ -176,12 +176,12 @@ class TestModel(unittest.IsolatedAsyncioTestCase):
         result = self.model.get_m1m3_bending_mode_stresses()
         self.assertEqual(len(result), 20)
 
-    def test_add_correction(self):
+    async def test_add_correction(self):
         wavefront_erros = np.zeros(19)
         default_config = {"sensor_ids": [0, 1, 2, 3, 4, 5, 6, 7, 8]}
 
         # Passing in zeros for wavefront_errors should return 0 in correction
-        self.model.add_correction(wavefront_erros, config=default_config)
+        await self.model.add_correction(wavefront_erros, config=default_config)
 
         x, y, z, u, v, w = self.model.m2_hexapod_correction()
 
@@ -210,7 +210,7 @@ class TestModel(unittest.IsolatedAsyncioTestCase):
         # except z correction.
 
         wavefront_erros[0] = 0.1
-        self.model.add_correction(wavefront_erros, config=default_config)
+        await self.model.add_correction(wavefront_erros, config=default_config)
 
         x, y, z_m2hex, u, v, w = self.model.m2_hexapod_correction()
 
@@ -287,6 +287,36 @@ class TestModel(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(self.model.get_wfe(), [])
         self.assertEqual(self.model.get_rejected_wfe(), [])
 
+    def test_get_sensor_ids_wfe_from_data_container(self):
+        data_container = {
+            1: (np.arange(4, 23), np.full(19, 0.1)),
+            5: (np.arange(4, 23), np.full(19, 0.5)),
+        }
+
+        (
+            sensor_ids,
+            zk_indices,
+            wfe,
+        ) = self.model.get_sensor_ids_wfe_from_data_container(data_container)
+
+        self.assertEqual(sensor_ids.tolist(), [1, 5])
+        self.assertEqual(zk_indices.shape, (2, 19))
+        self.assertEqual(wfe.shape, (2, 19))
+        self.assertTrue(np.all(zk_indices == np.arange(4, 23)))
+        self.assertTrue(np.allclose(wfe[0], 0.1))
+        self.assertTrue(np.allclose(wfe[1], 0.5))
+
+    def test_get_sensor_ids_wfe_from_empty_data_container(self):
+        (
+            sensor_ids,
+            zk_indices,
+            wfe,
+        ) = self.model.get_sensor_ids_wfe_from_data_container(dict())
+
+        self.assertEqual(len(sensor_ids), 0)
+        self.assertEqual(len(zk_indices), 0)
+        self.assertEqual(len(wfe), 0)
+
     def test_reject_unreasonable_wfe(self):
         self.assertEqual(self.model.reject_unreasonable_wfe([]), [])
 
@@ -574,6 +604,27 @@ class TestModel(unittest.IsolatedAsyncioTestCase):
                 ],
             )
 
+    async def test_log_stream_incomplete_last_line(self):
+        task = await asyncio.create_subprocess_shell(
+            "printf 'FIRST LINE\\n\\nSECOND LINE'",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+
+        with self.assertLogs("Model", level="DEBUG") as model_log:
+            await asyncio.wait_for(
+                self.model.log_stream(task.stdout),
+                timeout=SHORT_WAIT_TIME * 2.0,
+            )
+
+            self.assertEqual(
+                model_log.output,
+                [
+                    "DEBUG:Model:FIRST LINE",
+                    "DEBUG:Model:SECOND LINE",
+                ],
+            )
+
 
 if __name__ == "__main__":
     # Do the unit test
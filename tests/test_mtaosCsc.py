@@ -24,12 +24,14 @@ import glob
 import os
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
 import numpy as np
 import pytest
 import yaml
 from lsst.daf import butler as dafButler
 from lsst.ts import mtaos, salobj
+from lsst.ts.mtaos.mtaos import _truncate_bending_modes
 from lsst.ts.ofc import OFCData
 from lsst.ts.wep.utils import getModulePath as getModulePathWep
 from lsst.ts.wep.utils import runProgram, writeCleanUpRepoCmd
@@ -218,6 +220,46 @@ class CscTestCase(salobj.BaseCscTestCase, unittest.IsolatedAsyncioTestCase):
 
             await self._checkCorrIsZero(remote)
 
+    async def test_resetCorrection_during_runOFC(self):
+        async with self.make_csc(
+            initial_state=salobj.State.STANDBY, config_dir=None, simulation_mode=0
+        ):
+            await salobj.set_summary_state(self.remote, salobj.State.ENABLED)
+
+            remote = self._getRemote()
+
+            run_ofc_started = asyncio.Event()
+            finish_run_ofc = asyncio.Event()
+
+            async def calculate_corrections(**kwargs):
+                run_ofc_started.set()
+                await finish_run_ofc.wait()
+
+            with patch.object(
+                self.csc.model, "calculate_corrections", calculate_corrections
+            ):
+                run_ofc_task = asyncio.create_task(
+                    remote.cmd_runOFC.start(timeout=STD_TIMEOUT)
+                )
+                await asyncio.wait_for(run_ofc_started.wait(), timeout=SHORT_TIMEOUT)
+
+                # resetCorrection waits for runOFC to release the lock, but
+                # must acknowledge it is in progress in the meantime.
+                ackcmd = await remote.cmd_resetCorrection.start(
+                    timeout=SHORT_TIMEOUT, wait_done=False
+                )
+                self.assertEqual(ackcmd.ack, salobj.SalRetCode.CMD_INPROGRESS)
+
+                finish_run_ofc.set()
+
+                await run_ofc_task
+                ackcmd = await remote.cmd_resetCorrection.next_ackcmd(
+                    ackcmd, timeout=STD_TIMEOUT
+                )
+                self.assertEqual(ackcmd.ack, salobj.SalRetCode.CMD_COMPLETE)
+
+            await self._checkCorrIsZero(remote)
+
     async def _checkCorrIsZero(self, remote):
         await self.assert_next_sample(
             remote.evt_m2HexapodCorrection,
@@ -637,6 +679,87 @@ class CscTestCase(salobj.BaseCscTestCase, unittest.IsolatedAsyncioTestCase):
         assert "lsst_distrib" in sofware_versions.subsystemVersions
 
 
+class TestMTAOSHelpers(unittest.TestCase):
+    """Test the MTAOS helpers that do not need a running CSC."""
+
+    def test_build_wavefront_error_payload(self):
+        zk_indices = np.array([[4, 5, 22, 23, 3], [4, 6, 7, 8, 9]])
+        wfe = np.array([[0.1, 0.2, 0.3, 0.4, 0.5], [1.0, 2.0, 3.0, 4.0, 5.0]])
+
+        (
+            zk_indices_extended,
+            wfe_extended,
+            annular_zernike_coeffs,
+        ) = mtaos.MTAOS._build_wavefront_error_payload(zk_indices, wfe)
+
+        self.assertEqual(zk_indices_extended.shape, (2, 100))
+        self.assertEqual(wfe_extended.shape, (2, 100))
+        self.assertEqual(annular_zernike_coeffs.shape, (2, 19))
+
+        np.testing.assert_array_equal(zk_indices_extended[:, :5], zk_indices)
+        np.testing.assert_array_equal(zk_indices_extended[:, 5:], 0)
+        np.testing.assert_array_equal(wfe_extended[:, :5], wfe)
+        self.assertTrue(np.all(np.isnan(wfe_extended[:, 5:])))
+
+        # Noll indices outside z4 to z22 are not in the annular coefficients.
+        expected_annular_zernike_coeffs = np.zeros((2, 19))
+        expected_annular_zernike_coeffs[0, [0, 1, 18]] = [0.1, 0.2, 0.3]
+        expected_annular_zernike_coeffs[1, [0, 2, 3, 4, 5]] = [1, 2, 3, 4, 5]
+
+        np.testing.assert_array_equal(
+            annular_zernike_coeffs, expected_annular_zernike_coeffs
+        )
+
+    def test_build_wavefront_error_payload_no_sensors(self):
+        (
+            zk_indices_extended,
+            wfe_extended,
+            annular_zernike_coeffs,
+        ) = mtaos.MTAOS._build_wavefront_error_payload(
+            np.zeros((0, 19), dtype=int), np.zeros((0, 19))
+        )
+
+        self.assertEqual(zk_indices_extended.shape, (0, 100))
+        self.assertEqual(wfe_extended.shape, (0, 100))
+        self.assertEqual(annular_zernike_coeffs.shape, (0, 19))
+
+    def test_truncate_bending_modes(self):
+        stresses = np.array([3.0, 4.0, 12.0])
+        bending_modes = np.array([1.0, 2.0, 3.0])
+
+        stress = _truncate_bending_modes(
+            stresses, bending_modes, 26.0, stress_scale_factor=2.0, stress_limit=10.0
+        )
+
+        self.assertAlmostEqual(stress, 10.0)
+        np.testing.assert_array_equal(stresses, [3.0, 4.0, 0.0])
+        np.testing.assert_array_equal(bending_modes, [1.0, 2.0, 0.0])
+
+    def test_truncate_bending_modes_within_limit(self):
+        stresses = np.array([3.0, 4.0, 12.0])
+        bending_modes = np.array([1.0, 2.0, 3.0])
+
+        stress = _truncate_bending_modes(
+            stresses, bending_modes, 13.0, stress_scale_factor=1.0, stress_limit=13.0
+        )
+
+        self.assertEqual(stress, 13.0)
+        np.testing.assert_array_equal(stresses, [3.0, 4.0, 12.0])
+        np.testing.assert_array_equal(bending_modes, [1.0, 2.0, 3.0])
+
+    def test_truncate_bending_modes_all(self):
+        stresses = np.array([3.0, 4.0, 12.0])
+        bending_modes = np.array([1.0, 2.0, 3.0])
+
+        stress = _truncate_bending_modes(
+            stresses, bending_modes, 13.0, stress_scale_factor=1.0, stress_limit=2.0
+        )
+
+        self.assertEqual(stress, 0.0)
+        np.testing.assert_array_equal(stresses, 0.0)
+        np.testing.assert_array_equal(bending_modes, 0.0)
+
+
 if __name__ == "__main__":
     # Do the unit test
     unittest.main()
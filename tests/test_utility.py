@@ -178,6 +178,56 @@ class TestUtility(unittest.TestCase):
         self.assertAlmostEqual(sleep_time, np.mean(exec_time["MY_RETVAL"]), 2)
         self.assertAlmostEqual(sleep_time, np.mean(exec_time["AMY_RETVAL"]), 2)
 
+    def test_load_yaml(self):
+        yaml_str = "filter_name: g\nsensor_ids: [0, 1, 2]\n"
+
+        config = mtaos.load_yaml(yaml_str)
+
+        self.assertEqual(config, dict(filter_name="g", sensor_ids=[0, 1, 2]))
+
+        # Changing the returned value must not affect subsequent calls.
+        config["sensor_ids"].append(3)
+
+        self.assertEqual(mtaos.load_yaml(yaml_str)["sensor_ids"], [0, 1, 2])
+        self.assertIsNone(mtaos.load_yaml(""))
+        self.assertIsNone(mtaos.load_yaml("null\n"))
+
+        # Trivial documents must also return a new copy on every call.
+        empty_config = mtaos.load_yaml("{}")
+        self.assertEqual(empty_config, dict())
+        empty_config["filter_name"] = "g"
+        self.assertEqual(mtaos.load_yaml("{}"), dict())
+
+    def test_load_yaml_file(self):
+        file_path = Path(self.dataDir.name).joinpath("test.yaml")
+        file_path.write_text("filter_name: g\nsensor_ids: [0, 1, 2]\n")
+
+        config = mtaos.load_yaml_file(file_path)
+
+        self.assertEqual(config, dict(filter_name="g", sensor_ids=[0, 1, 2]))
+
+        # Changing the returned value must not affect subsequent calls.
+        config["sensor_ids"].append(3)
+
+        self.assertEqual(mtaos.load_yaml_file(file_path)["sensor_ids"], [0, 1, 2])
+
+        # Changing the file must invalidate the cached value, even if the
+        # modification time does not change.
+        stat = file_path.stat()
+        file_path.write_text("filter_name: r\n")
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        self.assertEqual(mtaos.load_yaml_file(file_path), dict(filter_name="r"))
+
+        # Replacing the file with one of the same size and modification time
+        # must also invalidate the cached value.
+        new_file_path = Path(self.dataDir.name).joinpath("new_test.yaml")
+        new_file_path.write_text("filter_name: i\n")
+        os.utime(new_file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(new_file_path, file_path)
+
+        self.assertEqual(mtaos.load_yaml_file(file_path), dict(filter_name="i"))
+
     @pytest.mark.xfail(
         reason="There is something wrong with the test data that causes this to fail.",
         raises=DatabaseConflictError,